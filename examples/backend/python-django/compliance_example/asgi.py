@@ -0,0 +1,17 @@
+"""
+ASGI config for compliance_example project.
+
+Run with: uvicorn compliance_example.asgi:application
+
+Prefer this over runserver/WSGI for the user endpoints: UserView's
+handlers are async, and under WSGI every call goes through async_to_sync.
+/health is a plain sync view and is cheap under either server.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'compliance_example.settings')
+
+application = get_asgi_application()
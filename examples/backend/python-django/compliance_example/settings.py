@@ -29,6 +29,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'users.middleware.ComplianceEvidenceMiddleware',
 ]
 
 ROOT_URLCONF = 'compliance_example.urls'
@@ -50,6 +51,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'compliance_example.wsgi.application'
+ASGI_APPLICATION = 'compliance_example.asgi.application'
 
 DATABASES = {
     'default': {
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class UsersConfig(AppConfig):
+    name = "users"
+
+    def ready(self):
+        from .evidence import evidence
+
+        # Start exporting compliance evidence (only if OpenTelemetry export is configured)
+        evidence.start()
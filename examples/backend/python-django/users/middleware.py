@@ -0,0 +1,17 @@
+"""Middleware that closes out compliance evidence when a view fails."""
+
+from django.utils.deprecation import MiddlewareMixin
+
+from .evidence import fail_active_spans
+
+
+class ComplianceEvidenceMiddleware(MiddlewareMixin):
+    """
+    End any evidence spans a failing view left open.
+
+    The exception is then left to Django's normal 500 handling.
+    """
+
+    def process_exception(self, request, exception):
+        fail_active_spans(exception)
+        return None
@@ -0,0 +1,54 @@
+"""
+Sharded in-memory user store.
+
+Records are spread over a fixed number of shards, each guarded by its own
+lock, so concurrent writes for different users do not contend on a single
+lock around the whole store.
+"""
+
+import threading
+
+SHARD_COUNT = 16
+
+
+class ShardedUserStore:
+    """Thread-safe user store keyed by user ID."""
+
+    def __init__(self, initial=None):
+        self._shards = [{} for _ in range(SHARD_COUNT)]
+        self._locks = [threading.RLock() for _ in range(SHARD_COUNT)]
+        for user_id, user in (initial or {}).items():
+            self.set(user_id, user)
+
+    def _index(self, user_id):
+        return hash(user_id) & (SHARD_COUNT - 1)
+
+    def get(self, user_id, default=None):
+        idx = self._index(user_id)
+        with self._locks[idx]:
+            return self._shards[idx].get(user_id, default)
+
+    def set(self, user_id, user):
+        idx = self._index(user_id)
+        with self._locks[idx]:
+            self._shards[idx][user_id] = user
+
+    def delete(self, user_id):
+        """Remove a user, returning the removed record or None."""
+        idx = self._index(user_id)
+        with self._locks[idx]:
+            return self._shards[idx].pop(user_id, None)
+
+    def values(self):
+        """
+        Iterate over all records, one shard at a time.
+
+        Each shard is copied under its own lock as it is reached, so callers
+        can stream the store without building a list of every record.
+        Records come back grouped by shard (string-hash order), not in
+        insertion order.
+        """
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                records = list(shard.values())
+            yield from records
@@ -0,0 +1,58 @@
+from contextvars import copy_context
+from unittest import TestCase
+
+from .evidence import BatchingSpanEmitter, _active_spans, fail_active_spans
+
+
+class RecordingEmitter(BatchingSpanEmitter):
+    """Emitter that records submissions instead of exporting them."""
+
+    def __init__(self):
+        super().__init__()
+        self.submitted = []
+
+    def submit(self, span, error):
+        self.submitted.append((span, error))
+
+
+class ActiveSpanTrackingTests(TestCase):
+    def setUp(self):
+        self.emitter = RecordingEmitter()
+        token = _active_spans.set(())
+        self.addCleanup(_active_spans.reset, token)
+
+    def test_end_removes_span_from_active_spans(self):
+        span = self.emitter.begin_span("gdpr", "Art.15")
+        span.end()
+
+        self.assertEqual(_active_spans.get(), ())
+
+    def test_end_with_error_removes_span_from_active_spans(self):
+        span = self.emitter.begin_span("gdpr", "Art.15")
+        span.end_with_error(Exception("User not found"))
+
+        self.assertEqual(_active_spans.get(), ())
+
+    def test_span_is_submitted_once(self):
+        span = self.emitter.begin_span("gdpr", "Art.15")
+        span.end()
+        span.end_with_error(Exception("late"))
+        fail_active_spans(Exception("later"))
+
+        self.assertEqual(self.emitter.submitted, [(span, None)])
+
+    def test_fail_active_spans_ends_open_spans(self):
+        span = self.emitter.begin_span("gdpr", "Art.17")
+        error = Exception("kaboom")
+        fail_active_spans(error)
+
+        self.assertEqual(self.emitter.submitted, [(span, error)])
+        self.assertEqual(_active_spans.get(), ())
+
+    def test_span_ended_in_copied_context_is_pruned(self):
+        streamed = self.emitter.begin_span("gdpr", "Art.15")
+        copy_context().run(streamed.end)
+
+        span = self.emitter.begin_span("gdpr", "Art.15")
+
+        self.assertEqual(_active_spans.get(), (span,))
@@ -1,9 +1,9 @@
 from django.urls import path
-from . import views
+from .views import UserView
 
 urlpatterns = [
-    path('user/<str:user_id>', views.get_user, name='get_user'),
-    path('user', views.create_user, name='create_user'),
-    path('users', views.list_users, name='list_users'),
-    path('user/<str:user_id>/delete', views.delete_user, name='delete_user'),
+    path('user/<str:user_id>', UserView.as_view(http_method_names=['get']), name='get_user'),
+    path('user', UserView.as_view(http_method_names=['post']), name='create_user'),
+    path('users', UserView.as_view(http_method_names=['get']), name='list_users'),
+    path('user/<str:user_id>/delete', UserView.as_view(http_method_names=['delete']), name='delete_user'),
 ]
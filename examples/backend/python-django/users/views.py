@@ -8,106 +8,141 @@ Demonstrates:
 - SOC 2 CC6.1: Authorization
 """
 
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
-import json
+from os import urandom
+import orjson
 
 # Import generated compliance modules
 from compliance.gdpr import GDPR
 from compliance.soc2 import SOC2
 
+from .evidence import evidence
+from .store import ShardedUserStore
+
 # In-memory user store for demo
-users_db = {
+users_db = ShardedUserStore({
     "123": {"id": "123", "email": "alice@example.com", "name": "Alice"},
     "456": {"id": "456", "email": "bob@example.com", "name": "Bob"},
-}
+})
 
+# Static payloads never change, so they are encoded once at import
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "version": "1.0.0",
+    "compliance": {
+        "frameworks": ["GDPR", "SOC2"],
+        "controls": ["Art.15", "Art.17", "Art.5(1)(f)", "CC6.1"]
+    }
+})
 
-def health(request):
-    """Health check endpoint."""
-    return JsonResponse({
-        "status": "healthy",
-        "version": "1.0.0",
-        "compliance": {
-            "frameworks": ["GDPR", "SOC2"],
-            "controls": ["Art.15", "Art.17", "Art.5(1)(f)", "CC6.1"]
-        }
-    })
+_NOT_FOUND_BYTES = orjson.dumps({"error": "User not found"})
 
 
-@require_http_methods(["GET"])
-def get_user(request, user_id):
-    """
-    Get user data - GDPR Art.15: Right of Access.
+class ORJSONResponse(HttpResponse):
+    """JSON response encoded with orjson instead of the stdlib encoder."""
 
-    Emits compliance evidence for data access.
-    """
-    span = GDPR.begin_span(GDPR.Art_15)
-    span.set_input("userId", user_id)
-    span.set_input("operation", "data_access")
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(
+            content=orjson.dumps(data),
+            **kwargs
+        )
 
-    try:
-        if user_id not in users_db:
-            span.end_with_error(Exception("User not found"))
-            return JsonResponse(
-                {"error": "User not found"},
-                status=404
-            )
 
-        user = users_db[user_id]
-        span.set_output("email", user["email"])
-        span.set_output("recordsReturned", 1)
-        span.end()
+def health(request):
+    """Health check endpoint."""
+    return HttpResponse(_HEALTH_BYTES, content_type="application/json")
 
-        return JsonResponse(user)
 
-    except Exception as e:
-        span.end_with_error(e)
-        return JsonResponse(
-            {"error": str(e)},
-            status=500
-        )
+@method_decorator(csrf_exempt, name="dispatch")
+class UserView(View):
+    """
+    User endpoints with compliance evidence.
+
+    Each URL narrows http_method_names through as_view(), so Django's
+    dispatcher answers other methods with 405 before any handler runs.
+    Handlers are async, so under ASGI (see compliance_example/asgi.py) they
+    run on the event loop without a thread hop. That is the only server
+    where they pay off: under WSGI (runserver, wsgi.py) Django wraps each
+    call in async_to_sync, which costs more than the view itself. Evidence
+    export happens on the emitter's worker thread.
+    """
 
+    http_method_names = ["get", "post", "delete"]
 
-@require_http_methods(["GET"])
-def list_users(request):
-    """List all users - GDPR Art.15: Right of Access."""
-    span = GDPR.begin_span(GDPR.Art_15)
-    span.set_input("operation", "list_all")
+    async def get(self, request, user_id=None):
+        if user_id is None:
+            return self.list_users(request)
+        return self.get_user(request, user_id)
 
-    try:
-        user_list = list(users_db.values())
-        span.set_output("recordsReturned", len(user_list))
-        span.end()
+    def get_user(self, request, user_id):
+        """
+        Get user data - GDPR Art.15: Right of Access.
 
-        return JsonResponse(user_list, safe=False)
+        Emits compliance evidence for data access.
+        """
+        span = evidence.begin_span("gdpr", GDPR.Art_15)
+        span.set_input("userId", user_id)
+        span.set_input("operation", "data_access")
 
-    except Exception as e:
-        span.end_with_error(e)
-        return JsonResponse(
-            {"error": str(e)},
-            status=500
-        )
-
-
-@csrf_exempt
-@require_http_methods(["POST"])
-def create_user(request):
-    """
-    Create user - GDPR Art.5(1)(f) + SOC 2 CC6.1.
+        user = users_db.get(user_id)
+        if user is None:
+            span.end_with_error(Exception("User not found"))
+            return HttpResponse(
+                _NOT_FOUND_BYTES,
+                status=404,
+                content_type="application/json"
+            )
 
-    Multi-framework evidence for security and authorization.
-    """
-    gdpr_span = GDPR.begin_span(GDPR.Art_51f)
-    soc2_span = SOC2.begin_span(SOC2.CC6_1)
+        span.set_output("email", user["email"])
+        span.set_output("recordsReturned", 1)
+        span.end()
 
-    try:
-        data = json.loads(request.body)
+        return ORJSONResponse(user)
+
+    def list_users(self, request):
+        """
+        List all users - GDPR Art.15: Right of Access.
+
+        Users are streamed as a JSON array one record at a time, and the
+        evidence records how many were actually sent.
+        """
+        span = evidence.begin_span("gdpr", GDPR.Art_15)
+        span.set_input("operation", "list_all")
+
+        # Each server gets the iterator it can consume without buffering
+        if isinstance(request, ASGIRequest):
+            stream = _astream_users(span)
+        else:
+            stream = _stream_users(span)
+
+        return StreamingHttpResponse(stream, content_type="application/json")
+
+    async def post(self, request):
+        """
+        Create user - GDPR Art.5(1)(f) + SOC 2 CC6.1.
+
+        Multi-framework evidence for security and authorization.
+        """
+        gdpr_span = evidence.begin_span("gdpr", GDPR.Art_51f)
+        soc2_span = evidence.begin_span("soc2", SOC2.CC6_1)
+
+        # Only client errors are handled here; server faults go to the middleware
+        try:
+            data = orjson.loads(request.body)
+            if not isinstance(data, dict):
+                raise ValueError("Request body must be a JSON object")
+        except ValueError as e:  # includes orjson.JSONDecodeError
+            gdpr_span.end_with_error(e)
+            soc2_span.end_with_error(e)
+            return ORJSONResponse({"error": str(e)}, status=400)
 
         # Generate user ID
-        import uuid
-        user_id = str(uuid.uuid4())
+        user_id = urandom(16).hex()
 
         user = {
             "id": user_id,
@@ -123,7 +158,7 @@ def create_user(request):
         soc2_span.set_input("authorized", True)
 
         # Store user
-        users_db[user_id] = user
+        users_db.set(user_id, user)
 
         gdpr_span.set_output("userId", user_id)
         gdpr_span.set_output("recordsCreated", 1)
@@ -132,44 +167,59 @@ def create_user(request):
         soc2_span.set_output("result", "success")
         soc2_span.end()
 
-        return JsonResponse(user, status=201)
-
-    except Exception as e:
-        gdpr_span.end_with_error(e)
-        soc2_span.end_with_error(e)
-        return JsonResponse(
-            {"error": str(e)},
-            status=500
-        )
+        return ORJSONResponse(user, status=201)
 
+    async def delete(self, request, user_id):
+        """
+        Delete user - GDPR Art.17: Right to Erasure.
 
-@csrf_exempt
-@require_http_methods(["DELETE"])
-def delete_user(request, user_id):
-    """
-    Delete user - GDPR Art.17: Right to Erasure.
-
-    Emits evidence proving data deletion.
-    """
-    span = GDPR.begin_span(GDPR.Art_17)
-    span.set_input("userId", user_id)
-    span.set_input("operation", "data_erasure")
+        Emits evidence proving data deletion.
+        """
+        span = evidence.begin_span("gdpr", GDPR.Art_17)
+        span.set_input("userId", user_id)
+        span.set_input("operation", "data_erasure")
 
-    try:
-        deleted = 0
-        if user_id in users_db:
-            del users_db[user_id]
-            deleted = 1
+        removed = users_db.delete(user_id)
+        deleted = 0 if removed is None else 1
 
         span.set_output("deletedRecords", deleted)
         span.set_output("tablesCleared", 1)
         span.end()
 
-        return JsonResponse({}, status=204)
+        return ORJSONResponse({}, status=204)
 
-    except Exception as e:
-        span.end_with_error(e)
-        return JsonResponse(
-            {"error": str(e)},
-            status=500
-        )
+
+def _stream_users(span):
+    count = 0
+    error = None
+    try:
+        yield b"["
+        for user in users_db.values():
+            yield orjson.dumps(user) if count == 0 else b"," + orjson.dumps(user)
+            count += 1
+        yield b"]"
+
+    except GeneratorExit:
+        # The server closed the response early (client disconnected)
+        error = Exception("Stream aborted by client")
+        raise
+    except BaseException as e:
+        error = e
+        raise
+
+    finally:
+        span.set_output("recordsReturned", count)
+        if error is None:
+            span.end()
+        else:
+            span.end_with_error(error)
+
+
+async def _astream_users(span):
+    stream = _stream_users(span)
+    try:
+        for chunk in stream:
+            yield chunk
+    finally:
+        # Close the sync generator too if this one is cancelled or closed
+        stream.close()
@@ -0,0 +1,313 @@
+"""
+Batched compliance evidence emission.
+
+The generated compliance modules define control IDs but no span API, so
+views record evidence on lightweight EvidenceSpan objects that only store
+plain dicts. Finished spans are queued, and a background thread turns them
+into OpenTelemetry spans in batches, so request handlers never pay for
+attribute conversion or export.
+
+Identical evidence (same control, inputs, outputs and result) seen again
+within DEDUP_WINDOW is not exported again. The repeats are exported as one
+span when the window expires: the first repeat, with its own timing, plus
+compliance.occurrences, compliance.last_seen_ns and links to the other
+requests that produced it.
+
+Spans that have begun but not ended are tracked per request context, so a
+framework-level exception handler can call fail_active_spans() instead of
+every view wrapping its body in try/except.
+
+Nothing is exported until start() is called at application startup, and
+then only if OpenTelemetry export is configured.
+
+Example:
+    span = evidence.begin_span("gdpr", GDPR.Art_15)
+    span.set_input("userId", user_id)
+    span.set_output("recordsReturned", 1)
+    span.end()
+"""
+
+from collections import deque
+from contextvars import ContextVar
+import atexit
+import logging
+import os
+import threading
+import time
+
+import orjson
+from opentelemetry import context, trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.trace import Link, Status, StatusCode
+
+logger = logging.getLogger(__name__)
+
+# Flush at least this often (seconds), or as soon as MAX_BATCH spans are queued
+FLUSH_INTERVAL = 0.01
+MAX_BATCH = 64
+
+# Repeats of identical evidence are coalesced for this long (seconds)
+DEDUP_WINDOW = 60.0
+MAX_TRACKED = 4096
+MAX_LINKS = 128
+
+# Evidence spans begun in the current context and not yet ended
+_active_spans = ContextVar("compliance_active_spans", default=())
+
+
+class EvidenceSpan:
+    """Evidence for a single control, exported when the emitter flushes."""
+
+    __slots__ = (
+        "_emitter", "_context", "_ended",
+        "framework", "control", "inputs", "outputs", "start_ns"
+    )
+
+    def __init__(self, emitter, framework, control):
+        self._emitter = emitter
+        self._context = context.get_current()
+        self._ended = False
+        self.framework = framework
+        self.control = control
+        self.inputs = {}
+        self.outputs = {}
+        self.start_ns = time.time_ns()
+
+    def set_input(self, key, value):
+        self.inputs[key] = value
+        return self
+
+    def set_output(self, key, value):
+        self.outputs[key] = value
+        return self
+
+    def end(self):
+        """Complete the evidence span successfully."""
+        self._finish(None)
+
+    def end_with_error(self, error):
+        """Complete the evidence span with an error."""
+        self._finish(error)
+
+    def _finish(self, error):
+        # A view and the framework error hook may both try to end a span
+        if self._ended:
+            return
+        self._ended = True
+        _deactivate(self)
+        self._emitter.submit(self, error)
+
+
+class BatchingSpanEmitter:
+    """Queues finished evidence spans and exports them from a worker thread."""
+
+    def __init__(
+        self,
+        flush_interval=FLUSH_INTERVAL,
+        max_batch=MAX_BATCH,
+        dedup_window=DEDUP_WINDOW,
+        max_tracked=MAX_TRACKED
+    ):
+        self._flush_interval = flush_interval
+        self._max_batch = max_batch
+        self._dedup_window = dedup_window
+        self._max_tracked = max_tracked
+        self._queue = deque()
+        # Evidence key -> _Repeats, in insertion (and therefore expiry) order
+        self._recent = {}
+        self._wakeup = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._tracer = None
+        self._thread = None
+
+    def start(self):
+        """
+        Start exporting evidence from a worker thread.
+
+        An SDK tracer provider that is already installed (for example by
+        opentelemetry-instrument) is used as is. Otherwise one is installed
+        only when OTEL_EXPORTER_OTLP_ENDPOINT is set. With neither, evidence
+        is dropped, just as the default no-op tracer would drop it.
+        """
+        if self._thread is not None:
+            return
+
+        provider = trace.get_tracer_provider()
+        if not isinstance(provider, TracerProvider):
+            if not os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT"):
+                return
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            provider = TracerProvider()
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+            trace.set_tracer_provider(provider)
+
+        self._tracer = provider.get_tracer("compliance-evidence")
+        self._thread = threading.Thread(
+            target=self._run,
+            name="compliance-evidence",
+            daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def begin_span(self, framework, control):
+        """Start collecting evidence for a framework control."""
+        span = EvidenceSpan(self, framework, control)
+        # Spans ended from another context (e.g. a streamed body) are pruned here
+        active = tuple(s for s in _active_spans.get() if not s._ended)
+        _active_spans.set(active + (span,))
+        return span
+
+    def submit(self, span, error):
+        if self._thread is None:
+            return
+        self._queue.append((span, error, time.time_ns()))
+        if len(self._queue) >= self._max_batch:
+            self._wakeup.set()
+
+    def flush(self, expire_all=False):
+        """Export every queued span and any expired repeat counts."""
+        with self._flush_lock:
+            now = time.monotonic()
+            while self._queue:
+                span, error, end_ns = self._queue.popleft()
+                key = _evidence_key(span, error)
+                repeats = self._recent.get(key)
+                if repeats is not None:
+                    repeats.add(span, end_ns)
+                    continue
+
+                self._recent[key] = _Repeats(now + self._dedup_window, error)
+                self._export(span, error, end_ns, 1)
+                if len(self._recent) > self._max_tracked:
+                    self._expire(next(iter(self._recent)))
+
+            while self._recent:
+                key = next(iter(self._recent))
+                if not expire_all and self._recent[key].expires > now:
+                    break
+                self._expire(key)
+
+    def close(self):
+        """Export everything still queued or being coalesced."""
+        self.flush(expire_all=True)
+
+    def _expire(self, key):
+        repeats = self._recent.pop(key)
+        if repeats.count:
+            self._export(
+                repeats.first,
+                repeats.error,
+                repeats.first_end_ns,
+                repeats.count,
+                last_seen_ns=repeats.last_seen_ns,
+                links=repeats.links
+            )
+
+    def _export(self, span, error, end_ns, occurrences, last_seen_ns=None, links=()):
+        try:
+            _export(self._tracer, span, error, end_ns, occurrences, last_seen_ns, links)
+        except Exception:
+            logger.exception("Failed to export compliance evidence")
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+def fail_active_spans(error):
+    """End every evidence span still open in this context with an error."""
+    active = _active_spans.get()
+    _active_spans.set(())
+    for span in active:
+        span.end_with_error(error)
+
+
+def _deactivate(span):
+    active = _active_spans.get()
+    if span in active:
+        _active_spans.set(tuple(s for s in active if s is not span))
+
+
+class _Repeats:
+    """Repeats of one piece of evidence seen inside the dedup window."""
+
+    __slots__ = ("expires", "error", "count", "first", "first_end_ns", "last_seen_ns", "links")
+
+    def __init__(self, expires, error):
+        self.expires = expires
+        self.error = error
+        self.count = 0
+        self.first = None
+        self.first_end_ns = 0
+        self.last_seen_ns = 0
+        self.links = []
+
+    def add(self, span, end_ns):
+        self.count += 1
+        self.last_seen_ns = end_ns
+        if self.first is None:
+            self.first = span
+            self.first_end_ns = end_ns
+            return
+
+        # Link the request each later repeat came from
+        parent = trace.get_current_span(span._context).get_span_context()
+        if parent.is_valid and len(self.links) < MAX_LINKS:
+            self.links.append(Link(parent))
+
+
+def _evidence_key(span, error):
+    payload = orjson.dumps(
+        (span.inputs, span.outputs),
+        default=str,
+        option=orjson.OPT_SORT_KEYS
+    )
+    result = None if error is None else (type(error).__name__, str(error))
+    return (span.framework, span.control, result, payload)
+
+
+def _attribute(value):
+    if isinstance(value, (str, bool, int, float)):
+        return value
+    return str(value)
+
+
+def _export(tracer, span, error, end_ns, occurrences, last_seen_ns, links):
+    attributes = {
+        "compliance.framework": span.framework,
+        "compliance.control": span.control,
+        "compliance.type": "evidence",
+        "compliance.duration_ms": (end_ns - span.start_ns) // 1_000_000,
+        "compliance.occurrences": occurrences,
+    }
+    if last_seen_ns is not None:
+        attributes["compliance.last_seen_ns"] = last_seen_ns
+    for key, value in span.inputs.items():
+        attributes["input." + key] = _attribute(value)
+    for key, value in span.outputs.items():
+        attributes["output." + key] = _attribute(value)
+
+    if error is None:
+        attributes["compliance.result"] = "success"
+    else:
+        attributes["compliance.result"] = "failure"
+        attributes["compliance.error"] = str(error)
+
+    otel_span = tracer.start_span(
+        f"{span.framework}.{span.control}",
+        context=span._context,
+        attributes=attributes,
+        links=links,
+        start_time=span.start_ns
+    )
+    if error is not None:
+        otel_span.record_exception(error, timestamp=end_ns)
+        otel_span.set_status(Status(StatusCode.ERROR, str(error)))
+    otel_span.end(end_time=end_ns)
+
+
+evidence = BatchingSpanEmitter()
@@ -8,24 +8,49 @@ This example demonstrates:
 - SOC 2 CC6.1: Logical Access - Authorization
 """
 
-from fastapi import FastAPI, HTTPException, status
+from asyncio import CancelledError
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, Path, Request, status
+from fastapi.responses import ORJSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel, EmailStr
-from typing import Dict, Optional
-import uuid
+from os import urandom
+from typing import Optional
+import orjson
 
 # Import generated compliance modules
 # These would be generated from your compliance-as-code framework
-from compliance.gdpr import GDPR, ComplianceSpan
+from compliance.gdpr import GDPR
 from compliance.soc2 import SOC2
 
+from evidence import EvidenceSpan, evidence, fail_active_spans
+from store import ShardedUserStore
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start exporting compliance evidence (only if OpenTelemetry export is configured)
+    evidence.start()
+    yield
+    evidence.close()
+
+
 app = FastAPI(
     title="Compliance Evidence API",
     description="FastAPI with GDPR and SOC 2 evidence",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# In-memory user store for demo
-users_db: Dict[str, "User"] = {}
+user_router = APIRouter(prefix="/user")
+users_router = APIRouter(prefix="/users")
+
+# IDs are lowercase hex (seed IDs are short, generated ones are 32 chars)
+USER_ID_PATTERN = r"^[0-9a-f]{1,32}$"
+
+# In-memory user store for demo. Records are stored already dumped to
+# plain dicts so reads never run pydantic validation or serialization.
+users_db = ShardedUserStore()
 
 
 class User(BaseModel):
@@ -41,84 +66,114 @@ class UserResponse(BaseModel):
 
 
 # Seed data
-users_db["123"] = User(id="123", email="alice@example.com", name="Alice")
-users_db["456"] = User(id="456", email="bob@example.com", name="Bob")
+users_db.set("123", {"id": "123", "email": "alice@example.com", "name": "Alice"})
+users_db.set("456", {"id": "456", "email": "bob@example.com", "name": "Bob"})
+
+# Static payloads never change, so they are encoded once at import
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "version": "1.0.0",
+    "compliance": {
+        "frameworks": ["GDPR", "SOC2"],
+        "controls": ["Art.15", "Art.17", "Art.5(1)(f)", "CC6.1"]
+    }
+})
+
+_NOT_FOUND_BYTES = orjson.dumps({"detail": "User not found"})
+
 
+@app.exception_handler(Exception)
+async def end_evidence_on_error(request: Request, exc: Exception):
+    """End any evidence spans a failing handler left open."""
+    fail_active_spans(exc)
+    return PlainTextResponse(
+        "Internal Server Error",
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+    )
 
-@app.get("/health")
+
+@app.get("/health", response_class=Response)
 async def health():
     """Health check endpoint."""
-    return {
-        "status": "healthy",
-        "version": "1.0.0",
-        "compliance": {
-            "frameworks": ["GDPR", "SOC2"],
-            "controls": ["Art.15", "Art.17", "Art.5(1)(f)", "CC6.1"]
-        }
-    }
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 
-@app.get("/user/{user_id}", response_model=UserResponse)
-async def get_user(user_id: str):
+@user_router.get("/{user_id}", responses={200: {"model": UserResponse}})
+async def get_user(user_id: str = Path(pattern=USER_ID_PATTERN)):
     """
     Get user data - GDPR Art.15: Right of Access.
 
     Emits compliance evidence for data access.
     """
     # Begin compliance evidence
-    span = GDPR.begin_span(GDPR.Art_15)
+    span = evidence.begin_span("gdpr", GDPR.Art_15)
     span.set_input("userId", user_id)
     span.set_input("operation", "data_access")
 
-    try:
-        if user_id not in users_db:
-            span.end_with_error(Exception("User not found"))
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
+    user = users_db.get(user_id)
+    if user is None:
+        span.end_with_error(Exception("User not found"))
+        return Response(
+            content=_NOT_FOUND_BYTES,
+            status_code=status.HTTP_404_NOT_FOUND,
+            media_type="application/json"
+        )
 
-        user = users_db[user_id]
-        span.set_output("email", user.email)
-        span.set_output("recordsReturned", 1)
-        span.end()
+    span.set_output("email", user["email"])
+    span.set_output("recordsReturned", 1)
+    span.end()
 
-        return user
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        span.end_with_error(e)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    return ORJSONResponse(user)
 
 
-@app.get("/users", response_model=list[UserResponse])
+@users_router.get("", responses={200: {"model": list[UserResponse]}})
 async def list_users():
     """
     List all users - GDPR Art.15: Right of Access.
+
+    Users are streamed as a JSON array one record at a time, and the
+    evidence records how many were actually sent.
     """
-    span = GDPR.begin_span(GDPR.Art_15)
+    span = evidence.begin_span("gdpr", GDPR.Art_15)
     span.set_input("operation", "list_all")
 
-    try:
-        user_list = list(users_db.values())
-        span.set_output("recordsReturned", len(user_list))
-        span.end()
+    return StreamingResponse(
+        _stream_users(span),
+        media_type="application/json"
+    )
 
-        return user_list
 
-    except Exception as e:
-        span.end_with_error(e)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+async def _stream_users(span: EvidenceSpan):
+    count = 0
+    error = None
+    try:
+        yield b"["
+        for user in users_db.values():
+            yield orjson.dumps(user) if count == 0 else b"," + orjson.dumps(user)
+            count += 1
+        yield b"]"
+
+    except (GeneratorExit, CancelledError):
+        # The client disconnected before the body was sent
+        error = Exception("Stream aborted by client")
+        raise
+    except BaseException as e:
+        error = e
+        raise
+
+    finally:
+        span.set_output("recordsReturned", count)
+        if error is None:
+            span.end()
+        else:
+            span.end_with_error(error)
 
 
-@app.post("/user", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+@user_router.post(
+    "",
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_201_CREATED: {"model": UserResponse}}
+)
 async def create_user(user: User):
     """
     Create user - GDPR Art.5(1)(f) + SOC 2 CC6.1.
@@ -126,76 +181,71 @@ async def create_user(user: User):
     Multi-framework evidence for security of processing and authorization.
     """
     # Multi-framework evidence
-    gdpr_span = GDPR.begin_span(GDPR.Art_51f)
-    soc2_span = SOC2.begin_span(SOC2.CC6_1)
-
-    try:
-        # Generate user ID
-        user_id = str(uuid.uuid4())
-        user.id = user_id
+    gdpr_span = evidence.begin_span("gdpr", GDPR.Art_51f)
+    soc2_span = evidence.begin_span("soc2", SOC2.CC6_1)
 
-        gdpr_span.set_input("email", user.email)
-        gdpr_span.set_input("operation", "create_user")
+    # Generate user ID
+    user_id = urandom(16).hex()
+    user.id = user_id
 
-        soc2_span.set_input("userId", user_id)
-        soc2_span.set_input("action", "create_user")
-        soc2_span.set_input("authorized", True)
+    gdpr_span.set_input("email", user.email)
+    gdpr_span.set_input("operation", "create_user")
 
-        # Store user
-        users_db[user_id] = user
+    soc2_span.set_input("userId", user_id)
+    soc2_span.set_input("action", "create_user")
+    soc2_span.set_input("authorized", True)
 
-        gdpr_span.set_output("userId", user_id)
-        gdpr_span.set_output("recordsCreated", 1)
-        gdpr_span.end()
+    # Store user
+    record = user.model_dump()
+    users_db.set(user_id, record)
 
-        soc2_span.set_output("result", "success")
-        soc2_span.end()
+    gdpr_span.set_output("userId", user_id)
+    gdpr_span.set_output("recordsCreated", 1)
+    gdpr_span.end()
 
-        return user
+    soc2_span.set_output("result", "success")
+    soc2_span.end()
 
-    except Exception as e:
-        gdpr_span.end_with_error(e)
-        soc2_span.end_with_error(e)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    return ORJSONResponse(record, status_code=status.HTTP_201_CREATED)
 
 
-@app.delete("/user/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user(user_id: str):
+@user_router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_user(user_id: str = Path(pattern=USER_ID_PATTERN)):
     """
     Delete user - GDPR Art.17: Right to Erasure.
 
     Emits evidence proving data deletion.
     """
-    span = GDPR.begin_span(GDPR.Art_17)
+    span = evidence.begin_span("gdpr", GDPR.Art_17)
     span.set_input("userId", user_id)
     span.set_input("operation", "data_erasure")
 
-    try:
-        deleted = 0
-        if user_id in users_db:
-            del users_db[user_id]
-            deleted = 1
-
-        span.set_output("deletedRecords", deleted)
-        span.set_output("tablesCleared", 1)
-        span.end()
-
-        return None
-
-    except Exception as e:
-        span.end_with_error(e)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    removed = users_db.delete(user_id)
+    deleted = 0 if removed is None else 1
+
+    span.set_output("deletedRecords", deleted)
+    span.set_output("tablesCleared", 1)
+    span.end()
+
+    return None
+
+
+app.include_router(user_router)
+app.include_router(users_router)
+
+# Build the OpenAPI schema (and every model JSON schema in it) at import,
+# so the first /docs or /openapi.json request does not pay for it
+app.openapi()
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
 
+    # Each worker is a separate process with its own in-memory user store,
+    # so more than one worker is opt-in: CRUD results would differ per worker
+    workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+
     print("=" * 50)
     print("FastAPI Compliance Evidence Example")
     print("=" * 50)
@@ -212,7 +262,18 @@ if __name__ == "__main__":
     print()
     print("Evidence emitted as OpenTelemetry spans")
     print("Configure OTEL_EXPORTER_OTLP_ENDPOINT to export")
+    print()
+    print(f"Workers: {workers} (WEB_CONCURRENCY>1 gives each worker its own store)")
     print("=" * 50)
     print()
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False
+    )
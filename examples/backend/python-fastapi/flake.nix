@@ -29,9 +29,12 @@
           propagatedBuildInputs = with pythonPackages; [
             fastapi
             uvicorn
+            uvloop
+            httptools
             pydantic
             pydantic-core
             email-validator
+            orjson
             opentelemetry-api
             opentelemetry-sdk
             opentelemetry-exporter-otlp
@@ -40,9 +43,10 @@
           # Copy generated compliance code
           preBuild = ''
             mkdir -p app/compliance
-            cp -r ${gdprCode}/gdpr/*.py app/compliance/
-            cp -r ${soc2Code}/soc2/*.py app/compliance/
-            touch app/compliance/__init__.py
+            cp ${gdprCode}/compliance/*.py app/compliance/
+            cp ${soc2Code}/compliance/*.py app/compliance/
+            # Each generated package re-exports only its own framework
+            : > app/compliance/__init__.py
           '';
 
           format = "other";
@@ -57,10 +61,19 @@
             cat > $out/bin/fastapi-compliance <<EOF
             #!${python}/bin/python
             import sys
-            sys.path.insert(0, "$out/lib/python")
-            from app.main import app
+            sys.path.insert(0, "$out/lib/python/app")
+            import os
             import uvicorn
-            uvicorn.run(app, host="0.0.0.0", port=8000)
+            uvicorn.run(
+                "main:app",
+                host="0.0.0.0",
+                port=8000,
+                workers=int(os.environ.get("WEB_CONCURRENCY", 1)),
+                loop="uvloop",
+                http="httptools",
+                log_level="warning",
+                access_log=False
+            )
             EOF
 
             chmod +x $out/bin/fastapi-compliance
@@ -117,8 +130,11 @@
             python
             pythonPackages.fastapi
             pythonPackages.uvicorn
+            pythonPackages.uvloop
+            pythonPackages.httptools
             pythonPackages.pydantic
             pythonPackages.email-validator
+            pythonPackages.orjson
             pkgs.curl
             pkgs.jq
           ];
@@ -127,11 +143,11 @@
             echo "FastAPI Compliance Example - Development Shell"
             echo ""
             echo "Generated compliance code:"
-            echo "  GDPR: ${gdprCode}/gdpr/"
-            echo "  SOC2: ${soc2Code}/soc2/"
+            echo "  GDPR: ${gdprCode}/compliance/"
+            echo "  SOC2: ${soc2Code}/compliance/"
             echo ""
             echo "Available commands:"
-            echo "  python -m app.main     - Run development server"
+            echo "  python app/main.py     - Run development server"
             echo "  nix build              - Build production binary"
             echo "  nix run                - Run server"
             echo "  nix run .#test         - Test endpoints"